@@ -1,26 +1,47 @@
-import base64
+import binascii
 import datetime
 import enum
+import functools
+import io
 import json
+import locale
 import logging
 import math
 import os
-import platform
+import shutil
 import subprocess
 import sys
 import threading
 import time
-import urllib.error
-import urllib.request
-from copy import deepcopy
 from pathlib import Path
-from typing import Any, Callable, Final, TypeAlias, overload
+from typing import Any, Callable, Final, Iterable, TypeAlias, overload
+
+_orjson: Any
+try:
+    import orjson as _orjson    # json の読み込みを高速化するオプションの依存パッケージ
+except ImportError:
+    _orjson = None
+
+_pybase64: Any
+try:
+    import pybase64 as _pybase64    # compress_hex 関数の base64 変換を高速化するオプションの依存パッケージ
+except ImportError:
+    _pybase64 = None
 
 DEFAULT_ENCODING: Final[str] = "utf-8"                  # ファイル IO の標準エンコード
 LOG_DIR: Final[Path] = Path("./logs")                   # ログを出力する際のディレクトリ
 LOG_PATH: Final[Path] = LOG_DIR / "lib.log"             # ログのファイルパス
 ERROR_LOG_PATH: Final[Path] = LOG_DIR / "error.log"     # エラーログのファイルパス
+USER_AGENT: Final[str] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/102.0.0.0 Safari/537.36"    # HTTP 通信で使用するユーザーエージェント
+_PYBASE64_MIN_SIZE: Final[int] = 256                    # pybase64 を使用する最小のデータサイズ ( 短いデータは標準ライブラリの方が速い )
+_URLSAFE_ENCODE_TABLE: Final[bytes] = bytes.maketrans(b"+/", b"-_")    # base64 の記号を URL で安全な文字に変換するテーブル
+_URLSAFE_DECODE_TABLE: Final[bytes] = bytes.maketrans(b"-_", b"+/")    # URL で安全な文字を base64 の記号に復元するテーブル
+_JST: Final[datetime.timezone] = datetime.timezone(datetime.timedelta(hours=9), "JST")     # 日本標準時のタイムゾーン
+_IS_WINDOWS: Final[bool] = sys.platform == "win32"                                     # 実行環境が Windows かどうか
+_CREATE_NO_WINDOW: Final[int] = subprocess.CREATE_NO_WINDOW if _IS_WINDOWS else 0      # Windows の環境ではコマンドプロンプトを表示しない ( 他の OS では 0 を指定する必要がある )
+_PYTHON_VERSION: Final[str] = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"   # 実行中の Python のバージョン
 main_logger: logging.Logger | None = None
+_np: Any = None             # numpy の読み込みに時間がかかるため、Vector2Array クラスを初めて使用する際に読み込む
 
 # type alias
 Number: TypeAlias = int | float
@@ -43,10 +64,22 @@ class LibErrorCode(enum.Enum):
     unknown = enum.auto()           # 不明なエラー
 
 
+_ERROR_MESSAGES: Final[dict[LibErrorCode, str]] = {     # ライブラリ内エラーコードに対応するエラーメッセージ
+    LibErrorCode.success: "処理が正常に終了しました",
+    LibErrorCode.file_not_found: "ファイルが見つかりませんでした",
+    LibErrorCode.http: "HTTP通信関係のエラーが発生しました",
+    LibErrorCode.argument: "引数が適切ではありません",
+    LibErrorCode.cancel: "処理がキャンセルされました",
+    LibErrorCode.unknown: "不明なエラーが発生しました",
+}
+
+
 class Vector2():
     """2 次元ベクトルの値を格納するためのクラス
     Vector2.x と Vector2.y か Vector2[0] と Vector2[1] でそれぞれの値にアクセスできる
     """
+    __slots__ = ("x", "y")     # インスタンスごとの __dict__ を作成しない
+
     def __init__(self, x: Number | tuple[Number, Number] | list[Number] = 0, y: Number = 0) -> None:
         """それぞれの値を初期化する、値を指定しなかった場合は 0 で初期化される
         x に Vector2 クラスをそのまま渡せば、その Vector2 の値で初期化される
@@ -61,7 +94,7 @@ class Vector2():
         self.set(x, y)
         return
 
-    def set(self, x: Number | tuple[Number, Number] | list[Number], y: Number = 0) -> Any:
+    def set(self, x: Number | tuple[Number, Number] | list[Number], y: Number = 0) -> "Vector2":
         """それぞれの値を初期化する、値を指定しなかった場合は 0 で初期化される
         x に Vector2 クラスをそのまま渡せば、その Vector2 の値で初期化される
         x にリストやタプルを渡した場合は、一つ目の要素が x 二つ目の要素が y となる
@@ -70,10 +103,10 @@ class Vector2():
             x: 数値を指定する
             y: 数値を指定する
         """
-        if isinstance(x, self.__class__) and y == 0:
+        if isinstance(x, Vector2) and y == 0:
             self.x = x.x
             self.y = x.y
-        elif type(x) is tuple or type(x) is list:
+        elif isinstance(x, (tuple, list)):
             if len(x) == 2 and y == 0:
                 self.x = x[0]
                 self.y = x[1]
@@ -100,39 +133,39 @@ class Vector2():
         """
         return self.x if self.x <= self.y else self.y
 
-    def round(self) -> Any:     # __class__ 未対応のため Any
+    def round(self) -> "Vector2":
         """x と y それぞれの小数点以下を丸める
 
         Returns:
             x, y の小数点以下を丸めた Vector2
         """
-        return self.__class__(round(self.x), round(self.y))
+        return Vector2(round(self.x), round(self.y))
 
-    def floor(self) -> Any:
+    def floor(self) -> "Vector2":
         """x と y それぞれの小数点以下を切り捨てる
 
         Returns:
             x, y の小数点以下を切り捨てた Vector2
         """
-        return self.__class__(math.floor(self.x), math.floor(self.y))
+        return Vector2(math.floor(self.x), math.floor(self.y))
 
-    def ceil(self) -> Any:
+    def ceil(self) -> "Vector2":
         """x と y それぞれの小数点以下を切り上げる
 
         Returns:
             x, y の小数点以下を切り上げた Vector2
         """
-        return self.__class__(math.ceil(self.x), math.ceil(self.y))
+        return Vector2(math.ceil(self.x), math.ceil(self.y))
 
-    def invert(self) -> Any:
+    def invert(self) -> "Vector2":
         """x と y の値を入れ替える
 
         Returns:
             x, y の値を入れ替えた Vector2
         """
-        return self.__class__(self.y, self.x)
+        return Vector2(self.y, self.x)
 
-    def to_self_type(self, x: Any) -> Any:
+    def to_self_type(self, x: Any) -> "Vector2":
         """自クラス型以外の値を自クラス型へ変換する
 
         Args:
@@ -141,10 +174,10 @@ class Vector2():
         Returns:
             自クラス型の値
         """
-        if isinstance(x, self.__class__):
+        if isinstance(x, Vector2):
             return x
         else:
-            return self.__class__(x, x)
+            return Vector2(x, x)
 
     def __str__(self) -> str:
         return f"x={self.x}, y={self.y}"
@@ -157,87 +190,118 @@ class Vector2():
 
     # 比較演算子
     def __eq__(self, other):
-        other = self.to_self_type(other)
-        return (self.x == other.x and self.y == other.y)
+        if isinstance(other, Vector2):
+            return (self.x == other.x and self.y == other.y)
+        return (self.x == other and self.y == other)
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
     def __lt__(self, other):
-        other = self.to_self_type(other)
-        return (self.x < other.x and self.y < other.y)
+        if isinstance(other, Vector2):
+            return (self.x < other.x and self.y < other.y)
+        return (self.x < other and self.y < other)
 
     def __gt__(self, other):
-        other = self.to_self_type(other)
-        return (self.x > other.x and self.y > other.y)
+        if isinstance(other, Vector2):
+            return (self.x > other.x and self.y > other.y)
+        return (self.x > other and self.y > other)
 
     # 算術演算子
     def __add__(self, other):
-        other = self.to_self_type(other)
-        return self.__class__(self.x + other.x, self.y + other.y)
+        if isinstance(other, Vector2):
+            return Vector2(self.x + other.x, self.y + other.y)
+        if isinstance(other, Vector2Array):
+            return NotImplemented   # Vector2Array との演算は Vector2Array 側の演算子で行う
+        return Vector2(self.x + other, self.y + other)
 
     def __sub__(self, other):
-        other = self.to_self_type(other)
-        return self.__class__(self.x - other.x, self.y - other.y)
+        if isinstance(other, Vector2):
+            return Vector2(self.x - other.x, self.y - other.y)
+        if isinstance(other, Vector2Array):
+            return NotImplemented   # Vector2Array との演算は Vector2Array 側の演算子で行う
+        return Vector2(self.x - other, self.y - other)
 
     def __mul__(self, other):
-        other = self.to_self_type(other)
-        return self.__class__(self.x * other.x, self.y * other.y)
+        if isinstance(other, Vector2):
+            return Vector2(self.x * other.x, self.y * other.y)
+        if isinstance(other, Vector2Array):
+            return NotImplemented   # Vector2Array との演算は Vector2Array 側の演算子で行う
+        return Vector2(self.x * other, self.y * other)
 
     def __truediv__(self, other):
-        other = self.to_self_type(other)
-        return self.__class__(self.x / other.x, self.y / other.y)
+        if isinstance(other, Vector2):
+            return Vector2(self.x / other.x, self.y / other.y)
+        if isinstance(other, Vector2Array):
+            return NotImplemented   # Vector2Array との演算は Vector2Array 側の演算子で行う
+        return Vector2(self.x / other, self.y / other)
 
     def __floordiv__(self, other):
-        other = self.to_self_type(other)
-        return self.__class__(self.x // other.x, self.y // other.y)
+        if isinstance(other, Vector2):
+            return Vector2(self.x // other.x, self.y // other.y)
+        if isinstance(other, Vector2Array):
+            return NotImplemented   # Vector2Array との演算は Vector2Array 側の演算子で行う
+        return Vector2(self.x // other, self.y // other)
 
     def __mod__(self, other):
-        other = self.to_self_type(other)
-        return self.__class__(self.x % other.x, self.y % other.y)
+        if isinstance(other, Vector2):
+            return Vector2(self.x % other.x, self.y % other.y)
+        if isinstance(other, Vector2Array):
+            return NotImplemented   # Vector2Array との演算は Vector2Array 側の演算子で行う
+        return Vector2(self.x % other, self.y % other)
 
     def __pow__(self, other):
-        other = self.to_self_type(other)
-        return self.__class__(self.x**other.x, self.y**other.y)
+        if isinstance(other, Vector2):
+            return Vector2(self.x**other.x, self.y**other.y)
+        if isinstance(other, Vector2Array):
+            return NotImplemented   # Vector2Array との演算は Vector2Array 側の演算子で行う
+        return Vector2(self.x**other, self.y**other)
 
     # 算術演算子 (右辺)
     def __radd__(self, other):
-        other = self.to_self_type(other)
-        return self.__class__(other.x + self.x, other.y + self.y)
+        if isinstance(other, Vector2):
+            return Vector2(other.x + self.x, other.y + self.y)
+        return Vector2(other + self.x, other + self.y)
 
     def __rsub__(self, other):
-        other = self.to_self_type(other)
-        return self.__class__(other.x - self.x, other.y - self.y)
+        if isinstance(other, Vector2):
+            return Vector2(other.x - self.x, other.y - self.y)
+        return Vector2(other - self.x, other - self.y)
 
     def __rmul__(self, other):
-        other = self.to_self_type(other)
-        return self.__class__(other.x * self.x, other.y * self.y)
+        if isinstance(other, Vector2):
+            return Vector2(other.x * self.x, other.y * self.y)
+        return Vector2(other * self.x, other * self.y)
 
     def __rtruediv__(self, other):
-        other = self.to_self_type(other)
-        return self.__class__(other.x / self.x, other.y / self.y)
+        if isinstance(other, Vector2):
+            return Vector2(other.x / self.x, other.y / self.y)
+        return Vector2(other / self.x, other / self.y)
 
     def __rfloordiv__(self, other):
-        other = self.to_self_type(other)
-        return self.__class__(other.x // self.x, other.y // self.y)
+        if isinstance(other, Vector2):
+            return Vector2(other.x // self.x, other.y // self.y)
+        return Vector2(other // self.x, other // self.y)
 
     def __rmod__(self, other):
-        other = self.to_self_type(other)
-        return self.__class__(other.x % self.x, other.y % self.y)
+        if isinstance(other, Vector2):
+            return Vector2(other.x % self.x, other.y % self.y)
+        return Vector2(other % self.x, other % self.y)
 
     def __rpow__(self, other):
-        other = self.to_self_type(other)
-        return self.__class__(other.x**self.x, other.y**self.y)
+        if isinstance(other, Vector2):
+            return Vector2(other.x**self.x, other.y**self.y)
+        return Vector2(other**self.x, other**self.y)
 
     # 単項演算子
     def __neg__(self):
-        return self.__class__(-self.x, -self.y)
+        return Vector2(-self.x, -self.y)
 
     def __pos__(self):
-        return self.__class__(+self.x, +self.y)
+        return Vector2(+self.x, +self.y)
 
     def __invert__(self):
-        return self.__class__(~self.x, ~self.y)
+        return Vector2(~self.x, ~self.y)
 
     def __len__(self):
         return 2
@@ -250,26 +314,169 @@ class Vector2():
         raise IndexError
 
 
+class Vector2Array():
+    """複数の 2 次元ベクトルの値を x と y それぞれの配列に分けて格納するためのクラス ( numpy が必要 )
+    演算は numpy で配列全体に対して一括で行われるため、大量のベクトルを扱う場合は Vector2 より高速に処理できる
+    """
+    __slots__ = ("xs", "ys")
+    __array_ufunc__ = None      # numpy の値との演算で numpy 側が配列として扱わず、このクラスの演算子を使用するようにする
+
+    def __init__(self, xs: Iterable[Number], ys: Iterable[Number]) -> None:
+        """それぞれの値を初期化する
+
+        Args:
+            xs: x の値の配列を指定する
+            ys: y の値の配列を指定する
+        """
+        _import_numpy()
+        self.xs = _np.asarray(xs, dtype=_np.float64)
+        self.ys = _np.asarray(ys, dtype=_np.float64)
+        if self.xs.shape != self.ys.shape:
+            raise ValueError("xs と ys の要素数が一致しません")
+        return
+
+    @classmethod
+    def from_vectors(cls, vectors: Iterable[Vector2]) -> "Vector2Array":
+        """Vector2 の配列から Vector2Array を作成する
+
+        Args:
+            vectors: Vector2 の配列
+
+        Returns:
+            全ての Vector2 の値を格納した Vector2Array
+        """
+        _import_numpy()
+        values = _np.array([(v.x, v.y) for v in vectors], dtype=_np.float64).reshape(-1, 2)     # 一度だけ走査して x と y に分割する
+        return cls(values[:, 0], values[:, 1])
+
+    def to_vectors(self) -> list[Vector2]:
+        """Vector2 のリストに変換する
+
+        Returns:
+            それぞれの値を格納した Vector2 のリスト
+        """
+        return [Vector2(x, y) for x, y in zip(self.xs.tolist(), self.ys.tolist())]
+
+    def max(self) -> Any:
+        """それぞれのベクトルの x と y のうち大きい方の値を取得する
+
+        Returns:
+            x か y の値の配列
+        """
+        return _np.maximum(self.xs, self.ys)
+
+    def min(self) -> Any:
+        """それぞれのベクトルの x と y のうち小さい方の値を取得する
+
+        Returns:
+            x か y の値の配列
+        """
+        return _np.minimum(self.xs, self.ys)
+
+    def sum(self) -> Vector2:
+        """全てのベクトルの合計を取得する
+
+        Returns:
+            x, y それぞれの合計値を格納した Vector2
+        """
+        return Vector2(float(self.xs.sum()), float(self.ys.sum()))
+
+    def norm(self) -> Any:
+        """それぞれのベクトルの長さを取得する
+
+        Returns:
+            ベクトルの長さの配列
+        """
+        return _np.hypot(self.xs, self.ys)
+
+    @staticmethod
+    def split_operand(other: Any) -> tuple[Any, Any]:
+        """演算の相手を x と y の値に分割する
+
+        Args:
+            other: Vector2Array か Vector2 か数値
+
+        Returns:
+            x と y それぞれの値
+        """
+        if isinstance(other, Vector2Array):
+            return other.xs, other.ys
+        if isinstance(other, Vector2):
+            return other.x, other.y
+        return other, other
+
+    def __str__(self) -> str:
+        return f"xs={self.xs}, ys={self.ys}"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def __getitem__(self, index: int) -> Vector2:
+        return Vector2(float(self.xs[index]), float(self.ys[index]))
+
+    # 算術演算子
+    def __add__(self, other):
+        ox, oy = self.split_operand(other)
+        return Vector2Array(self.xs + ox, self.ys + oy)
+
+    def __sub__(self, other):
+        ox, oy = self.split_operand(other)
+        return Vector2Array(self.xs - ox, self.ys - oy)
+
+    def __mul__(self, other):
+        ox, oy = self.split_operand(other)
+        return Vector2Array(self.xs * ox, self.ys * oy)
+
+    def __truediv__(self, other):
+        ox, oy = self.split_operand(other)
+        return Vector2Array(self.xs / ox, self.ys / oy)
+
+    # 算術演算子 (右辺)
+    def __radd__(self, other):
+        ox, oy = self.split_operand(other)
+        return Vector2Array(ox + self.xs, oy + self.ys)
+
+    def __rsub__(self, other):
+        ox, oy = self.split_operand(other)
+        return Vector2Array(ox - self.xs, oy - self.ys)
+
+    def __rmul__(self, other):
+        ox, oy = self.split_operand(other)
+        return Vector2Array(ox * self.xs, oy * self.ys)
+
+    def __rtruediv__(self, other):
+        ox, oy = self.split_operand(other)
+        return Vector2Array(ox / self.xs, oy / self.ys)
+
+    # 単項演算子
+    def __neg__(self):
+        return Vector2Array(-self.xs, -self.ys)
+
+    def __pos__(self):
+        return Vector2Array(+self.xs, +self.ys)
+
+
 class Url(str):
     """URL を格納するクラス
     """
+    SCHEME_END: Final[str] = "://"     # スキームの区切り文字
+
     def __new__(cls, *content):
         return str.__new__(cls, content[0])     # 他の引数を認識させないために情報を削る
 
     def __init__(self, url: str, param: dict[str, Any] = {}) -> None:
-        self.url = str(url)     # Url クラスを渡されてもそのまま文字列として処理する
-        self.param = deepcopy(param)
-        self.SCHEME_END: Final[str] = "://"
+        self.url = str(url)         # Url クラスを渡されてもそのまま文字列として処理する
+        self.param = dict(param)    # パラメーターの値は変更不可なスカラー値のみを想定しているため、浅いコピーで十分
 
         if "?" in self.url:
-            temp = self.url.split("?")
-            if len(temp) != 2:
-                raise ValueError("不正な URL です")
-            self.url = temp[0]  # URL から ? を削除する
-            if temp[1] != "":   # パラメーターが存在すれば
-                for row in temp[1].split("&"):
-                    k, v = row.split("=")
-                    self.param |= {k: v}
+            self.url, _, query = self.url.partition("?")    # URL から ? 以降を削除する
+            for row in query.split("&"):
+                if row != "":                               # パラメーターが存在すれば
+                    k, _, v = row.partition("=")
+                    self.param[k] = v
         return
 
     @property
@@ -288,10 +495,11 @@ class Url(str):
         Returns:
             現在の URL の上位 URL
         """
-        temp = self.url.split(self.SCHEME_END)
-        if len(temp) != 2:
-            return self.__class__(("/").join(self.url.split("/")[:-1]), self.param)
-        return self.__class__(temp[0] + (self.SCHEME_END) + ("/").join(temp[1].split("/")[:-1]), self.param)
+        head = self.url.rpartition("/")[0]                      # 最後の / より前を取得する
+        scheme_pos = self.url.find(self.SCHEME_END)
+        if scheme_pos != -1 and len(head) < scheme_pos + len(self.SCHEME_END):
+            head = self.url[:scheme_pos + len(self.SCHEME_END)]  # 最後の / がスキームの区切りであれば、スキームまでを残す
+        return self.__class__(head, self.param)
 
     def with_name(self, name: str) -> Any:
         """URL の name 属性を引数に与えた名前に変換した URL を取得
@@ -325,7 +533,7 @@ class Url(str):
         Returns:
             パラメータを削除した URL オブジェクト
         """
-        param = deepcopy(self.param)
+        param = dict(self.param)
         param.pop(key)
         return self.__class__(self.url, param)
 
@@ -343,19 +551,17 @@ class Url(str):
         return self.__class__(self.url + "/" + other, self.param)
 
     def __str__(self) -> str:
-        if self.param:
-            result = self.url
-            for i, (k, v) in enumerate(self.param.items()):
-                if i == 0:
-                    result += "?"
-                else:
-                    result += "&"
-                if type(v) is bool:     # bool 型はすべて小文字にする
-                    v = str(v).lower()
-                result += f"{k}={v}"
-            return result
-
-        return self.url
+        if not self.param:
+            return self.url
+
+        params = []
+        for k, v in self.param.items():
+            if v is True:               # bool 型はすべて小文字にする
+                v = "true"
+            elif v is False:
+                v = "false"
+            params.append(f"{k}={v}")
+        return f"{self.url}?{'&'.join(params)}"
 
     def __repr__(self) -> str:
         return self.__str__()
@@ -392,7 +598,7 @@ class JsonData():
             default: 値が存在しなかった場合のデフォルトの値を設定する
             path: Jsonファイルのパス
         """
-        self.keys = keys
+        self.keys = tuple(keys) if isinstance(keys, (list, tuple)) else (keys, )     # タプルでもリストでもなければタプルに加工する
         self.default = default
         self.path = Path(path)
         self.data = None
@@ -409,8 +615,6 @@ class JsonData():
         """
         try:
             json_data = load_json(self.path)
-            if type(self.keys) is not list and type(self.keys) is not tuple:
-                self.keys = (self.keys, )       # タプルでもリストでもなければタプルに加工する
             try:
                 for row in self.keys:
                     json_data = json_data[row]  # キーの名前をたどっていく
@@ -470,10 +674,12 @@ class JsonData():
         Returns:
             データがファイルに保存されれば True
         """
-        if not can_cast(self.get(), int):                   # int 型に変換できない場合は初期化する
+        try:
+            current = int(self.get())
+        except (TypeError, ValueError):                 # int 型に変換できない場合は初期化する
             get_main_logger().error(f"使用できない値を初期化します [keys={self.keys}, value={self.get()}]")
-            self.set(0)
-        return self.set(int(self.get()) + num, save_flag)   # 一つインクリメントして値を保存する
+            current = 0
+        return self.set(current + num, save_flag)       # 一つインクリメントして値を保存する
 
     def get(self) -> JsonValue:
         """現在保持している値を取得する
@@ -504,7 +710,7 @@ class JsonData():
         Returns:
             値にたどり着くまでのキー
         """
-        return tuple(self.keys)
+        return self.keys
 
     def get_default(self) -> JsonValue:
         """設定されているデフォルト値を取得する
@@ -549,21 +755,11 @@ def get_error_message(code: LibErrorCode) -> str:
     Returns:
         コードに対応するエラーメッセージ
     """
-    if code == LibErrorCode.success:
-        return "処理が正常に終了しました"
-    elif code == LibErrorCode.file_not_found:
-        return "ファイルが見つかりませんでした"
-    elif code == LibErrorCode.http:
-        return "HTTP通信関係のエラーが発生しました"
-    elif code == LibErrorCode.argument:
-        return "引数が適切ではありません"
-    elif code == LibErrorCode.cancel:
-        return "処理がキャンセルされました"
-    elif code == LibErrorCode.unknown:
-        return "不明なエラーが発生しました"
-    else:
+    message = _ERROR_MESSAGES.get(code)
+    if message is None:
         get_main_logger().error("登録されていないエラーコードが呼ばれました")
-    return "不明なエラーが発生しました"
+        return "不明なエラーが発生しました"
+    return message
 
 
 def create_logger(name: str = "main", path: Path | None = None, error_path: Path | None = None, level=logging.DEBUG, encoding=DEFAULT_ENCODING) -> logging.Logger:
@@ -636,6 +832,42 @@ def set_main_logger(logger: logging.Logger) -> None:
     return
 
 
+def _import_numpy() -> Any:
+    """numpy を読み込む ( 起動時間を短縮するため、ライブラリの読み込み時ではなく必要になった時に読み込む )
+
+    Returns:
+        numpy モジュール
+    """
+    global _np
+    if _np is not None:
+        return _np
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Vector2Array クラスを使用するには numpy をインストールしてください")
+    _np = numpy
+    return _np
+
+
+def _json_loads(data: str | bytes) -> Any:
+    """json 文字列をデータに変換する ( orjson がインストールされていれば orjson を使用する )
+
+    Args:
+        data: json 文字列か、DEFAULT_ENCODING でエンコードされた json のバイト列
+
+    Returns:
+        変換したデータ
+    """
+    if _orjson is not None:
+        try:
+            return _orjson.loads(data)
+        except _orjson.JSONDecodeError:     # NaN や 64 bit を超える整数など、orjson が対応していない値は標準の json で読み込む
+            pass
+    if type(data) is bytes:
+        data = data.decode(DEFAULT_ENCODING)
+    return json.loads(data)
+
+
 def load_json(file_path: str | Path) -> Any:
     """json ファイルを読み込む
 
@@ -645,9 +877,9 @@ def load_json(file_path: str | Path) -> Any:
     Returns:
         読み込んだ json ファイルのデータ
     """
-    with open(file_path, "r", encoding=DEFAULT_ENCODING) as f:
-        obj = json.load(f)
-    return obj
+    with open(file_path, "rb") as f:
+        data = f.read()
+    return _json_loads(data)
 
 
 def save_json(file_path: str | Path, obj: Any, ensure_ascii: bool = False) -> None:
@@ -658,8 +890,9 @@ def save_json(file_path: str | Path, obj: Any, ensure_ascii: bool = False) -> No
         data: 保存するデータ
         ensure_ascii: 非 ASCII 文字文字をエスケープする
     """
+    data_str = json.dumps(obj, indent=4, ensure_ascii=ensure_ascii)    # 変換に失敗した場合にファイルを空にしないよう、先に文字列に変換する
     with open(file_path, "w", encoding=DEFAULT_ENCODING) as f:
-        json.dump(obj, f, indent=4, ensure_ascii=ensure_ascii)
+        f.write(data_str)
     return
 
 
@@ -673,13 +906,13 @@ def json_dumps(json_data: str | dict, ensure_ascii: bool = False) -> str:
     Returns:
         整形された Json 形式の文字列
     """
-    data = json.loads(json_data) if (type(json_data) is str) else json_data
+    data = _json_loads(json_data) if (type(json_data) is str) else json_data
     data_str = json.dumps(data, indent=4, ensure_ascii=ensure_ascii)
     return data_str
 
 
 def update_nest_dict(dictionary: dict, keys: object | list | tuple, value: object) -> bool:
-    """ネストされた辞書内の特定の値のみを再帰で変更する関数
+    """ネストされた辞書内の特定の値のみを変更する関数
 
     Args:
         dictionary: 更新する辞書
@@ -687,19 +920,35 @@ def update_nest_dict(dictionary: dict, keys: object | list | tuple, value: objec
         value: 上書きする値
 
     Returns:
-        再帰せずに更新した場合のみ True、再帰した場合は False
+        ネストされた辞書を辿らずに更新した場合のみ True、辿った場合は False
     """
-    if type(keys) is not list and type(keys) is not tuple:
+    if not isinstance(keys, (list, tuple)):
         keys = (keys, )                                         # 渡されがキーがリストでもタプルでもなければタプルに変換する
-    if len(keys) == 1:
-        dictionary[keys[0]] = value                             # 最深部に到達したら値を更新する
-        return True
-    if keys[0] in dictionary:
-        update_nest_dict(dictionary[keys[0]], keys[1:], value)  # すでにキーがあればその内部から更に探す
-    else:
-        dictionary[keys[0]] = {}                                # キーが存在しなければ空の辞書を追加する
-        update_nest_dict(dictionary[keys[0]], keys[1:], value)
-    return False
+    target = dictionary
+    for key in keys[:-1]:
+        if isinstance(target, dict):
+            target = target.setdefault(key, {})                 # すでにキーがあればその内部から更に探し、無ければ空の辞書を追加する
+        elif isinstance(target, list):
+            target = target[key]                                # リストはインデックスで要素を辿る
+        else:
+            raise TypeError(f"辞書とリスト以外の値の内部は更新できません [key={key}, type={type(target).__name__}]")
+    target[keys[-1]] = value                                    # 最深部に到達したら値を更新する
+    return len(keys) == 1
+
+
+def _open_url(url: str) -> Any:
+    """ライブラリ共通のユーザーエージェントを設定して URL を開く
+    urllib.request.install_opener で設定されたオープナーがあればそれが使用される
+
+    Args:
+        url: 開く URL
+
+    Returns:
+        レスポンスオブジェクト
+    """
+    import urllib.request       # 読み込みに時間がかかるため、初めて HTTP 通信を行う際に読み込む
+    req = urllib.request.Request(url, None, {"User-Agent": USER_AGENT})
+    return urllib.request.urlopen(req)
 
 
 def check_url(url: str) -> bool:
@@ -712,9 +961,7 @@ def check_url(url: str) -> bool:
         リンク先に正常にアクセスできた場合は True
     """
     try:
-        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/102.0.0.0 Safari/537.36"}
-        req = urllib.request.Request(url, None, headers)
-        f = urllib.request.urlopen(req)
+        f = _open_url(url)
         f.close()
         time.sleep(0.1)
     except Exception:
@@ -733,18 +980,23 @@ def download_file(url: str, dest_path: str, overwrite: bool = True) -> LibErrorC
     Returns:
         ライブラリのエラーコード
     """
+    import urllib.error
+
     if not overwrite and os.path.isfile(dest_path):
         return LibErrorCode.cancel
 
+    temp_path = f"{dest_path}.part"                                         # ダウンロード途中のファイルを dest_path に残さないための一時ファイル
     try:
-        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/102.0.0.0 Safari/537.36"}
-        req = urllib.request.Request(url, None, headers)
-        with urllib.request.urlopen(req) as web_file:
-            data = web_file.read()
-            with open(dest_path, mode="wb") as local_file:
-                local_file.write(data)
-                time.sleep(0.1)
-                return LibErrorCode.success
+        with _open_url(url) as web_file:
+            try:
+                with open(temp_path, mode="wb") as local_file:
+                    shutil.copyfileobj(web_file, local_file, 1024 * 1024)   # 全体をメモリに読み込まずに少しずつ書き込む
+                os.replace(temp_path, dest_path)
+            finally:
+                if os.path.isfile(temp_path):
+                    os.remove(temp_path)                                    # 失敗した場合は一時ファイルを削除する
+        time.sleep(0.1)
+        return LibErrorCode.success
     except urllib.error.HTTPError as e:
         get_main_logger().error(f"ファイルのダウンロードに失敗しました [url={url}]")
         get_main_logger().exception(e)
@@ -799,12 +1051,31 @@ def read_tail(path: str, n: int, encoding: str | None = None) -> list[str]:
     Returns:
         実際に読み込んだ結果
     """
+    if "\n".encode(encoding or locale.getpreferredencoding(False)) != b"\n":     # utf-16 や BOM 付きなど、改行を 1 バイトで表せないエンコードはすべての行を読み込む
+        try:
+            with open(path, "r", encoding=encoding) as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            lines = []
+        return lines[-n:]
     try:
-        with open(path, "r", encoding=encoding) as f:
-            lines = f.readlines()   # すべての行を取得する
+        with open(path, "rb") as f:
+            pos = f.seek(0, os.SEEK_END)
+            blocks = []
+            newline_num = 0
+            while pos > 0 and (n <= 0 or newline_num <= n):     # 必要な行数より多くの改行が見つかるまで後ろからブロック単位で読み込む
+                read_size = min(8192, pos)
+                pos -= read_size
+                f.seek(pos)
+                blocks.append(f.read(read_size))
+                newline_num += blocks[-1].count(b"\n")
     except FileNotFoundError:
-        lines = []
-    return lines[-n:]               # 後ろから n 行だけ返す
+        return []
+    data = b"".join(reversed(blocks))
+    if pos > 0:
+        data = data[data.find(b"\n") + 1:]                     # ファイルの途中から読み込んだ先頭の行は取り除く
+    lines = io.TextIOWrapper(io.BytesIO(data), encoding=encoding).readlines()
+    return lines[-n:]                                           # 後ろから n 行だけ返す
 
 
 def rename_path(file_path: str, dest_name: str, up_hierarchy_num: int = 0, slash_only: bool = False) -> str:
@@ -851,15 +1122,23 @@ def get_check_digit(jan_code: int | str) -> int | None:
         jan_code = jan_code[:12]
     if len(jan_code) != 12:
         return None
+    if not jan_code.isdecimal():
+        return _calc_check_digit(jan_code)      # 数字以外を含む場合は毎回エラーを記録するため、キャッシュを使用しない
+    return _calc_check_digit_cached(jan_code)   # 同じ JAN コードはキャッシュから返す
+
 
+def _calc_check_digit(jan_code: str) -> int | None:
+    """JAN コードの最初の 12 桁からチェックデジットを計算する
+
+    Args:
+        jan_code: JAN コードの最初の 12 桁
+
+    Returns:
+        13 桁目のチェックデジット
+    """
     try:
-        even_sum = 0
-        odd_sum = 0
-        for i in range(12):
-            if (i + 1) % 2 == 0:
-                even_sum += int(jan_code[i])                        # 偶数桁の合計
-            else:
-                odd_sum += int(jan_code[i])                         # 奇数桁の合計
+        odd_sum = sum(map(int, jan_code[0::2]))                     # 奇数桁の合計
+        even_sum = sum(map(int, jan_code[1::2]))                    # 偶数桁の合計
         check_digit = (10 - (even_sum * 3 + odd_sum) % 10) % 10     # チェックデジット
     except Exception as e:
         get_main_logger().exception(e)
@@ -867,6 +1146,19 @@ def get_check_digit(jan_code: int | str) -> int | None:
     return check_digit
 
 
+@functools.lru_cache(maxsize=4096)
+def _calc_check_digit_cached(jan_code: str) -> int | None:
+    """数字のみで構成された JAN コードの最初の 12 桁からチェックデジットを計算して、結果をキャッシュする
+
+    Args:
+        jan_code: JAN コードの最初の 12 桁
+
+    Returns:
+        13 桁目のチェックデジット
+    """
+    return _calc_check_digit(jan_code)
+
+
 def program_pause(program_end: bool = True) -> None:
     """入力待機でプログラムを一時停止する関数
 
@@ -915,13 +1207,13 @@ def get_datetime_now(to_str: bool = False) -> datetime.datetime | str:
     Returns:
         日本の現在時間を datetime 型か文字列で返す
     """
-    datetime_now = datetime.datetime.now(datetime.timezone(datetime.timedelta(hours=9), "JST"))     # 日本の現在時刻を取得する
+    datetime_now = datetime.datetime.now(_JST)          # 日本の現在時刻を取得する
     if not to_str:
         return datetime_now
-    return datetime_now.strftime("%Y-%m-%d %H:%M:%S")                                               # 文字列に変換する
+    return datetime_now.isoformat(" ", "seconds")[:19]  # "%Y-%m-%d %H:%M:%S" の形式の文字列に変換する ( 末尾のタイムゾーンは取り除く )
 
 
-def compress_hex(hex_str: str, decompression: bool = False) -> str:
+def compress_hex(hex_str: str | bytes | bytearray | memoryview, decompression: bool = False) -> str:
     """16進数の文字列を圧縮、展開する
 
     Args:
@@ -932,45 +1224,62 @@ def compress_hex(hex_str: str, decompression: bool = False) -> str:
         圧縮 or 展開した文字列
     """
     if decompression:                                           # 展開が指定されていれば展開する
-        if type(hex_str) is not str:
+        if not isinstance(hex_str, str):
             return ""                                           # 文字列以外が渡されたら空白の文字列を返す
-        hex_str = hex_str.replace("-", "+").replace("_", "/")   # 安全な文字列を base64 の記号に復元する
-        hex_str += "=" * (len(hex_str) % 4)                     # 取り除いたパディングを復元する
-        hex_bytes = hex_str.encode()
-
-        hex_bytes = base64.b64decode(hex_bytes)
-        hex_bytes = base64.b16encode(hex_bytes)
+        hex_bytes = hex_str.encode().translate(_URLSAFE_DECODE_TABLE)  # 安全な文字列を base64 の記号に復元する
+        hex_bytes += b"=" * (-len(hex_bytes) & 3)                       # 取り除いたパディングを 4 文字単位になるまで復元する
+        if _pybase64 is not None and len(hex_bytes) // 4 * 3 >= _PYBASE64_MIN_SIZE:     # 圧縮時と同じく展開後のデータサイズで判定する
+            hex_bytes = _pybase64.b64decode(hex_bytes, validate=False)  # 標準ライブラリと同じく、使用できない文字は無視する
+        else:
+            hex_bytes = binascii.a2b_base64(hex_bytes)
+        hex_bytes = binascii.hexlify(hex_bytes).upper()
         return hex_bytes.decode()
 
-    if type(hex_str) is str:
-        hex_bytes = hex_str.encode()    # バイナリデータでなければバイナリに変換する
-    elif type(hex_str) is bytes:
-        hex_bytes = hex_str
+    hex_data: bytes | bytearray | memoryview
+    if isinstance(hex_str, str):
+        hex_data = hex_str.encode("ascii")                      # バイナリデータでなければバイナリに変換する
+    elif isinstance(hex_str, (bytes, bytearray, memoryview)):
+        hex_data = hex_str                                      # バイナリデータはコピーせずにそのまま使用する
     else:
         raise ValueError("使用できない型が使用されました")
-    if len(hex_bytes) % 2 != 0:
-        hex_bytes = b"0" + hex_bytes    # 奇数の場合は先頭に0を追加して偶数にする
-
-    hex_bytes = base64.b16decode(hex_bytes, casefold=True)
-    hex_bytes = base64.b64encode(hex_bytes)
-    return hex_bytes.decode().replace("=", "").replace("+", "-").replace("/", "_")  # パディングを取り除いて安全な文字列に変換する
+    if len(hex_data) % 2 != 0:                                  # 奇数の場合は先頭の 1 文字を単独で変換して、全体のコピーを避ける
+        head = binascii.unhexlify(b"0" + memoryview(hex_data)[:1])     # 偶数桁の場合と同じく不正な文字は binascii.Error になる
+        hex_bytes = head + binascii.unhexlify(memoryview(hex_data)[1:])
+    else:
+        hex_bytes = binascii.unhexlify(hex_data)                # 大文字と小文字のどちらも変換できる
+    if _pybase64 is not None and len(hex_bytes) >= _PYBASE64_MIN_SIZE:
+        return _pybase64.urlsafe_b64encode(hex_bytes).rstrip(b"=").decode()    # 安全な文字列に直接変換して、パディングを取り除く
+    hex_bytes = binascii.b2a_base64(hex_bytes, newline=False)
+    return hex_bytes.translate(_URLSAFE_ENCODE_TABLE, b"=").decode("ascii")    # 安全な文字列への変換とパディングの削除を一度に行う
 
 
 def subprocess_command(command: StrList) -> bytes:
     """OS のコマンドを実行する
+    コマンドはシェルを経由せずに実行されるため、リダイレクトやパイプなどのシェルの構文は使用できない
 
     Args:
-        command: 実行するコマンド
+        command: 実行するコマンドと引数のリスト
 
     Returns:
         実行結果
     """
-    if platform.system() == "Windows":                  # Windows の環境ではコマンドプロンプトを表示しないようにする
-        si = subprocess.STARTUPINFO()
-        si.dwFlags |= subprocess.STARTF_USESHOWWINDOW   # コマンドプロンプトを表示しない
-        return subprocess.check_output(command, startupinfo=si)
-    else:                                               # STARTUPINFO が存在しない OS があるため処理を分岐する
-        return subprocess.check_output(command)
+    args: StrList | str = command
+    if _IS_WINDOWS and not isinstance(command, str):
+        args = _list2cmdline(tuple(command))        # Windows では引数のリストを一つの文字列に変換して渡す
+    return subprocess.check_output(args, creationflags=_CREATE_NO_WINDOW)
+
+
+@functools.lru_cache(maxsize=128)
+def _list2cmdline(command: tuple[str, ...]) -> str:
+    """引数のリストを Windows のコマンドライン文字列に変換する ( 同じコマンドはキャッシュから返す )
+
+    Args:
+        command: 実行するコマンドと引数
+
+    Returns:
+        コマンドライン文字列
+    """
+    return subprocess.list2cmdline(command)
 
 
 def can_cast(x: Any, cast_type: Callable) -> bool:
@@ -985,7 +1294,7 @@ def can_cast(x: Any, cast_type: Callable) -> bool:
     """
     try:
         cast_type(x)
-    except ValueError:
+    except (ValueError, TypeError):     # int(None) など、型が原因で変換できない場合も False を返す
         return False
     return True
 
@@ -996,5 +1305,4 @@ def get_python_version() -> str:
     Returns:
         Python のバージョン
     """
-    version = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
-    return version
+    return _PYTHON_VERSION      # 実行中に変わることは無いため、起動時に作成した文字列を返す
@@ -1,22 +1,21 @@
 import re
-from codecs import open
-import os
+from pathlib import Path
 
 import setuptools
 
-here = os.path.abspath(os.path.dirname(__file__))
+here = Path(__file__).resolve().parent
 package_name = "nlib3"
 
-with open(os.path.join(here, "README.md"), encoding="utf-8") as f:
-    long_description = f.read()
+long_description = (here / "README.md").read_text(encoding="utf-8")
+init_text = (here / package_name.replace("-", "_") / "__init__.py").read_text(encoding="utf-8")
 
-with open(os.path.join(here, package_name.replace("-", "_"), "__init__.py")) as f:
-    init_text = f.read()
-    version = re.search(r'__version__\s*=\s*[\'\"](.+?)[\'\"]', init_text).group(1)
-    license = re.search(r'__license__\s*=\s*[\'\"](.+?)[\'\"]', init_text).group(1)
-    author = re.search(r'__author__\s*=\s*[\'\"](.+?)[\'\"]', init_text).group(1)
-    author_email = re.search(r'__author_email__\s*=\s*[\'\"](.+?)[\'\"]', init_text).group(1)
-    url = re.search(r'__url__\s*=\s*[\'\"](.+?)[\'\"]', init_text).group(1)
+meta_pattern = re.compile(r'^__(version|license|author|author_email|url)__\s*=\s*[\'\"](.+?)[\'\"]', re.MULTILINE)
+meta = {m.group(1): m.group(2) for m in meta_pattern.finditer(init_text)}     # 一度の走査で全てのメタデータを取得する
+version = meta.get("version")
+license = meta.get("license")
+author = meta.get("author")
+author_email = meta.get("author_email")
+url = meta.get("url")
 
 assert version
 assert license
@@ -30,6 +29,7 @@ setuptools.setup(
     version=version,                                                        # バージョン
     license=license,                                                        # ライセンス
     install_requires=[],                                                    # pip install する際に同時にインストールされるパッケージ名をリスト形式で指定
+    extras_require={"numpy": ["numpy"], "orjson": ["orjson"], "pybase64": ["pybase64"]},    # オプションの機能で使用するパッケージ名を指定 ( pip install nlib3[numpy] で同時にインストールされる )
     author=author,                                                          # パッケージ作者の名前
     author_email=author_email,                                              # パッケージ作者の連絡先メールアドレス
     url=url,                                                                # パッケージに関連するサイトの URL ( GitHub など )